@@ -158,6 +158,12 @@ function connectToSignaling() {
             // log("❄️ Added ICE Candidate");
             await pc.addIceCandidate(new RTCIceCandidate(data.candidate));
         }
+        else if (data.type === "candidates") {
+            // Batched candidates from the Python client
+            for (const candidate of data.candidates) {
+                await pc.addIceCandidate(new RTCIceCandidate(candidate));
+            }
+        }
     };
 
     ws.onerror = (e) => log("❌ WebSocket Error. Check IP/Port/Firewall.");
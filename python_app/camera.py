@@ -1,5 +1,5 @@
 import asyncio
-import time
+import threading
 import fractions
 
 import cv2
@@ -8,6 +8,18 @@ import pyrealsense2 as rs
 from aiortc import VideoStreamTrack
 from av import VideoFrame
 
+# Frames buffered by the V4L2 camera driver
+FRAME_QUEUE_SIZE = 2
+
+# How long stop() waits (seconds) for the capture thread to leave a read
+CAPTURE_STOP_TIMEOUT = 1.0
+
+# RealSense waits are bounded well below CAPTURE_STOP_TIMEOUT so the capture
+# thread notices stop() promptly; the camera is considered lost after
+# REALSENSE_STALL_TIMEOUT_MS (librealsense's default wait) without frames
+REALSENSE_WAIT_TIMEOUT_MS = 250
+REALSENSE_STALL_TIMEOUT_MS = 5000
+
 
 class MediaStreamError(Exception):
     """Exception raised when media stream is not in live state"""
@@ -54,17 +66,56 @@ class CameraVideoTrack(VideoStreamTrack):
         self.VIDEO_CLOCK_RATE = 90000
         self.VIDEO_PTIME = 1 / fps
         self.VIDEO_TIME_BASE = fractions.Fraction(1, self.VIDEO_CLOCK_RATE)
+        # Rounded rather than truncated so fractional fps does not drift
+        self._pts_inc = int(round(self.VIDEO_CLOCK_RATE / fps))
+        
+        # Latest-frame buffer filled by the capture thread
+        self._frame_lock = threading.Lock()
+        self._frame_event = asyncio.Event()
+        self._latest = (0, None)
+        self._last_frame_idx = 0
+        self._capture_error = None
+        self._capture_thread = None
+        self._running = False
+        self._loop = None
+        self._missed_waits = 0  # Consecutive RealSense waits that timed out
         
         # Initialize camera based on type
         self.cap = None
         self.pipe = None
+        self._frame_format = "bgr24"
         
+        # The camera configuration is fixed, so the capture thread's per-frame
+        # read method is picked once here rather than branched on every frame
         if self.camera_type == "rgb":
             self._init_rgb_camera()
+            self._read_frame = self._read_rgb
         elif self.camera_type == "realsense":
+            if self.stream_type == "color":
+                self._read_frame = self._read_realsense_color
+            elif self.stream_type == "depth":
+                self._read_frame = self._read_realsense_depth
+            else:
+                raise ValueError(f"Invalid stream_type for RealSense: {self.stream_type}. Must be 'color' or 'depth'")
             self._init_realsense_camera()
         else:
             raise ValueError(f"Invalid camera type: {camera_type}. Must be 'rgb' or 'realsense'")
+        
+        # Preallocated frame pool reused by the capture thread: one buffer being
+        # filled, one published in the slot, one possibly being copied by recv()
+        if self._frame_format == "yuyv422":
+            # V4L2 with CONVERT_RGB off returns YUYV as a CV_8UC2 (H, W, 2) Mat;
+            # any other shape makes cap.read() allocate a new array per frame
+            buffer_shape = (self.height, self.width, 2)
+        else:
+            buffer_shape = (self.height, self.width, 3)
+        self._pool = [np.empty(buffer_shape, dtype=np.uint8) for _ in range(3)]
+        self._pool_idx = 0
+        
+        # Depth colormap as a lookup table indexed by raw 16-bit depth
+        self._depth_lut = None
+        if self.camera_type == "realsense" and self.stream_type == "depth":
+            self._depth_lut = self._build_depth_lut()
     
     def _init_rgb_camera(self):
         """Initialize RGB camera (webcam, wrist camera, etc.)"""
@@ -73,9 +124,25 @@ class CameraVideoTrack(VideoStreamTrack):
         if not self.cap.isOpened():
             raise RuntimeError(f"RGB camera {self.camera_index} not found or cannot be opened")
         
+        # Ask V4L2 for the sensor's native YUYV so frames reach the encoder
+        # without a BGR round trip; other backends keep OpenCV's BGR output
+        if self.cap.getBackendName() == "V4L2":
+            fourcc = cv2.VideoWriter_fourcc(*"YUYV")
+            self.cap.set(cv2.CAP_PROP_FOURCC, fourcc)
+            if int(self.cap.get(cv2.CAP_PROP_FOURCC)) == fourcc:
+                self.cap.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+                self._frame_format = "yuyv422"
+        
         self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
         self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
         self.cap.set(cv2.CAP_PROP_FPS, self.fps)
+        
+        # Small driver queue: absorbs consumer jitter without adding latency
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, FRAME_QUEUE_SIZE)
+        
+        # Use the size the driver actually negotiated
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
     
     def _init_realsense_camera(self):
         """Initialize Intel RealSense camera with depth stream"""
@@ -83,13 +150,28 @@ class CameraVideoTrack(VideoStreamTrack):
         cfg = rs.config()
         
         cfg.enable_stream(rs.stream.depth, self.width, self.height, rs.format.z16, self.fps)
-        cfg.enable_stream(rs.stream.color, self.width, self.height, rs.format.bgr8, self.fps)
+        cfg.enable_stream(rs.stream.color, self.width, self.height, rs.format.yuyv, self.fps)
+        
+        if self.stream_type == "color":
+            self._frame_format = "yuyv422"
         
         try:
             self.pipe.start(cfg)
         except RuntimeError as e:
             raise RuntimeError(f"Failed to start RealSense camera: {e}")
     
+    @staticmethod
+    def _build_depth_lut():
+        """Precompute the BGR JET colormap for every possible z16 depth value
+        
+        Returns:
+            (65536, 3) uint8 table, equivalent to convertScaleAbs(alpha=0.03)
+            followed by applyColorMap(COLORMAP_JET)
+        """
+        depth_values = np.arange(65536, dtype=np.uint16).reshape(1, -1)
+        scaled = cv2.convertScaleAbs(depth_values, alpha=0.03)
+        return cv2.applyColorMap(scaled, cv2.COLORMAP_JET).reshape(65536, 3)
+    
     async def next_timestamp(self) -> tuple[int, fractions.Fraction]:
         """Generate next timestamp for video frame
         
@@ -102,14 +184,19 @@ class CameraVideoTrack(VideoStreamTrack):
         if self.readyState != "live":
             raise MediaStreamError("Live stream is stopped or not started")
         
+        # Monotonic loop clock: immune to wallclock jumps and the same clock
+        # asyncio.sleep() schedules against
+        now = asyncio.get_running_loop().time()
+        
         if hasattr(self, "_timestamp"):
-            self._timestamp += int(self.VIDEO_PTIME * self.VIDEO_CLOCK_RATE)
-            wait = self._start + (self._timestamp / self.VIDEO_CLOCK_RATE) - time.time()
+            self._timestamp += self._pts_inc
+            wait = self._start + (self._timestamp / self.VIDEO_CLOCK_RATE) - now
             
-            if wait > 0:
+            # Waits shorter than the loop's timer resolution are not worth a timer
+            if wait > 0.001:
                 await asyncio.sleep(wait)
         else:
-            self._start = time.time()
+            self._start = now
             self._timestamp = 0
         
         return self._timestamp, self.VIDEO_TIME_BASE
@@ -117,84 +204,182 @@ class CameraVideoTrack(VideoStreamTrack):
     async def recv(self):
         """Receive next video frame
         
-        This is the main method called by aiortc. It dispatches to the appropriate
-        frame capture method based on camera type.
+        This is the main method called by aiortc. Frames are grabbed by a
+        background capture thread; this coroutine only waits for the newest
+        one, so the blocking camera read never runs on the event loop.
         
         Returns:
             VideoFrame object
         """
-        if self.camera_type == "rgb":
-            return await self._recv_rgb()
-        elif self.camera_type == "realsense":
-            return await self._recv_realsense()
+        if self._capture_thread is None:
+            self._start_capture()
+        
+        pts, time_base = await self.next_timestamp()
+        frame = await self._next_frame()
+        
+        # Hand the capture layout (YUYV or BGR) straight to the encoder
+        video_frame = VideoFrame.from_ndarray(frame, format=self._frame_format)
+        video_frame.pts = pts
+        video_frame.time_base = time_base
+        
+        return video_frame
     
-    async def _recv_rgb(self):
-        """Capture frame from RGB camera
+    def _start_capture(self):
+        """Start the background capture thread bound to the running event loop"""
+        self._loop = asyncio.get_running_loop()
+        self._running = True
+        self._capture_thread = threading.Thread(
+            target=self._capture_loop,
+            name=f"camera-{self.camera_type}-{self.camera_index}",
+            daemon=True
+        )
+        self._capture_thread.start()
+    
+    def _capture_loop(self):
+        """Continuously grab frames into the single-slot latest-frame buffer
+        
+        Older frames are overwritten rather than queued, so the consumer always
+        gets the freshest frame and no backlog can build up. Once started, this
+        thread owns the device and releases it on exit, so it is never released
+        while a read is in progress.
+        """
+        frame_idx = 0
+        try:
+            while self._running:
+                try:
+                    frame = self._read_frame()
+                except Exception as e:
+                    self._capture_error = e
+                    self._running = False
+                else:
+                    if frame is None:
+                        # Read timed out; retry so stop() is seen promptly
+                        continue
+                    frame_idx += 1
+                    with self._frame_lock:
+                        self._latest = (frame_idx, frame)
+                
+                try:
+                    self._loop.call_soon_threadsafe(self._frame_event.set)
+                except RuntimeError:
+                    # Event loop already closed
+                    break
+        finally:
+            self._release()
+    
+    async def _next_frame(self):
+        """Wait for a frame newer than the last one returned
         
         Returns:
-            VideoFrame with RGB data
+            ndarray from the latest-frame buffer, laid out as self._frame_format
+        
+        Raises:
+            RuntimeError: If the capture thread failed to read from the camera
         """
-        pts, time_base = await self.next_timestamp()
+        while True:
+            self._frame_event.clear()
+            with self._frame_lock:
+                frame_idx, frame = self._latest
+            
+            if frame_idx != self._last_frame_idx:
+                self._last_frame_idx = frame_idx
+                return frame
+            
+            if self._capture_error is not None:
+                raise self._capture_error
+            
+            await self._frame_event.wait()
+    
+    def _next_buffer(self):
+        """Return the next buffer from the preallocated frame pool"""
+        buf = self._pool[self._pool_idx]
+        self._pool_idx = (self._pool_idx + 1) % len(self._pool)
+        return buf
+    
+    def _read_rgb(self):
+        """Capture frame from RGB camera
         
-        ret, frame = self.cap.read()
+        Returns:
+            ndarray with YUYV (HxWx2) or BGR (HxWx3) data
+        """
+        ret, frame = self.cap.read(self._next_buffer())
         if not ret:
             raise RuntimeError(f"Failed to read frame from RGB camera {self.camera_index}")
         
-        # Convert BGR (OpenCV format) to RGB
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return frame
+    
+    def _wait_for_frames(self):
+        """Wait a bounded time for the next RealSense frameset
         
-        video_frame = VideoFrame.from_ndarray(frame, format="rgb24")
-        video_frame.pts = pts
-        video_frame.time_base = time_base
+        Returns:
+            Frameset, or None if none arrived within REALSENSE_WAIT_TIMEOUT_MS
         
-        return video_frame
+        Raises:
+            RuntimeError: If no frames arrived for REALSENSE_STALL_TIMEOUT_MS
+        """
+        ok, frames = self.pipe.try_wait_for_frames(REALSENSE_WAIT_TIMEOUT_MS)
+        if ok:
+            self._missed_waits = 0
+            return frames
+        
+        self._missed_waits += 1
+        if self._missed_waits * REALSENSE_WAIT_TIMEOUT_MS >= REALSENSE_STALL_TIMEOUT_MS:
+            raise RuntimeError("No frames received from RealSense camera")
+        return None
     
-    async def _recv_realsense(self):
-        """Capture frame from RealSense camera
+    def _read_realsense_color(self):
+        """Capture color frame from RealSense camera
         
         Returns:
-            VideoFrame with either color or depth stream based on stream_type
+            ndarray with native YUYV (HxWx2) data, fed to the encoder as-is,
+            or None if no frame arrived within REALSENSE_WAIT_TIMEOUT_MS
         """
-        pts, time_base = await self.next_timestamp()
+        frames = self._wait_for_frames()
+        if frames is None:
+            return None
         
-        frames = self.pipe.wait_for_frames()
         color_frame = frames.get_color_frame()
-        depth_frame = frames.get_depth_frame()
+        if not color_frame:
+            raise RuntimeError("Failed to read frames from RealSense camera")
+        
+        # Zero-copy view; it keeps the librealsense frame alive while published
+        color_image = np.frombuffer(color_frame.get_data(), dtype=np.uint8)
+        return color_image.reshape(self.height, self.width, 2)
+    
+    def _read_realsense_depth(self):
+        """Capture depth frame from RealSense camera
         
-        if not color_frame or not depth_frame:
+        Returns:
+            ndarray with the depth stream as a BGR colormap, or None if no
+            frame arrived within REALSENSE_WAIT_TIMEOUT_MS
+        """
+        frames = self._wait_for_frames()
+        if frames is None:
+            return None
+        
+        depth_frame = frames.get_depth_frame()
+        if not depth_frame:
             raise RuntimeError("Failed to read frames from RealSense camera")
         
-        if self.stream_type == "color":
-            # Return RGB color stream
-            color_image = np.asanyarray(color_frame.get_data())
-            color_image = cv2.cvtColor(color_image, cv2.COLOR_BGR2RGB)
-            
-            video_frame = VideoFrame.from_ndarray(color_image, format="rgb24")
-            video_frame.pts = pts
-            video_frame.time_base = time_base
-            return video_frame
-            
-        elif self.stream_type == "depth":
-            # Return depth stream as colormap
-            depth_image = np.asanyarray(depth_frame.get_data())
-            
-            # Apply colormap to depth image for visualization
-            depth_colormap = cv2.applyColorMap(
-                cv2.convertScaleAbs(depth_image, alpha=0.03),
-                cv2.COLORMAP_JET
-            )
-            depth_colormap = cv2.cvtColor(depth_colormap, cv2.COLOR_BGR2RGB)
-            
-            video_frame = VideoFrame.from_ndarray(depth_colormap, format="rgb24")
-            video_frame.pts = pts
-            video_frame.time_base = time_base
-            return video_frame
+        depth_image = np.frombuffer(depth_frame.get_data(), dtype=np.uint16)
+        depth_image = depth_image.reshape(self.height, self.width)
         
-        else:
-            raise ValueError(f"Invalid stream_type for RealSense: {self.stream_type}. Must be 'color' or 'depth'")
+        # Apply colormap to depth image for visualization (single LUT gather)
+        return np.take(self._depth_lut, depth_image, axis=0, out=self._next_buffer(), mode="clip")
     
     def stop(self):
         """Stop the camera and release resources"""
+        self._running = False
+        if self._capture_thread is not None:
+            # The capture thread releases the device itself once its current
+            # read returns (VideoCapture is not thread-safe)
+            self._capture_thread.join(timeout=CAPTURE_STOP_TIMEOUT)
+            self._capture_thread = None
+        else:
+            self._release()
+    
+    def _release(self):
+        """Release the camera device"""
         if self.cap is not None:
             self.cap.release()
             self.cap = None
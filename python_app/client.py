@@ -7,12 +7,20 @@ Dual-mode client supporting:
 
 import argparse
 import asyncio
+import collections
 import json
 import logging
-from datetime import datetime
+import os
+import queue
+import sys
+import threading
+import time
 
+import av
 import cv2
+import msgpack
 import numpy as np
+import orjson
 import websockets
 from aiortc import (
     RTCPeerConnection,
@@ -25,6 +33,11 @@ from aiortc import (
 from av import VideoFrame
 from camera import CameraVideoTrack
 
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows
+    uvloop = None
+
 # Configuration
 SIGNALING_SERVER_URL = "wss://readytoserve.online/ws"
 ICE_SERVERS = [
@@ -40,6 +53,47 @@ ICE_SERVERS = [
     {"urls": "stun:stun4.l.google.com:5349"}
 ]
 
+# Built once and shared by every peer connection (including reconnects)
+_ICE_CONFIG = RTCConfiguration(
+    iceServers=[RTCIceServer(urls=server["urls"]) for server in ICE_SERVERS]
+)
+
+# Outbound ICE candidates are batched; this caps a batch at a few KB
+MAX_CANDIDATES_PER_MESSAGE = 16
+
+# Lets orjson encode what json.dumps accepted for actions: numpy scalars
+# (e.g. float64 joystick/arm readings) and non-str dict keys
+ACTION_JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+# Control actions are coalesced and sent at most once per interval (50 Hz)
+ACTION_INTERVAL = 0.02
+
+# Data channel backpressure (bytes): sending pauses above the high watermark
+# and resumes once aiortc drains below the low threshold
+SEND_HIGH_WATERMARK = 64 * 1024
+SEND_LOW_THRESHOLD = 16 * 1024
+
+# Operator display is refreshed at most this often, independent of stream fps
+DISPLAY_INTERVAL = 1 / 15
+
+# Slack (seconds) on the display deadline, about half a frame at 30 fps, so
+# arrival jitter does not make every other frame narrowly miss its slot
+DISPLAY_SLACK = DISPLAY_INTERVAL / 4
+
+# OpenCV's Cocoa backend aborts when HighGUI is used off the main thread, so
+# on macOS the display is driven from the event loop thread instead
+DISPLAY_ON_LOOP_THREAD = sys.platform == "darwin"
+
+# Frames lagging live by more than this (seconds) are dropped from display
+MAX_DISPLAY_LAG = 0.5
+
+# recv() only takes longer than this (seconds) when no frames are queued,
+# i.e. when the receiver is at the live edge of the stream
+LIVE_RECV_WAIT = 0.001
+
+# Frames waiting to be encoded before the recorder starts dropping them
+RECORD_QUEUE_SIZE = 60
+
 # Logging setup
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -48,37 +102,81 @@ logger = logging.getLogger(__name__)
 class WebRTCClient:
     """WebRTC client for robot teleoperation"""
     
-    def __init__(self, role, camera_type="rgb"):
+    # Cached "%H:%M:%S" stamp for _log and the second it was formatted for
+    _log_second = None
+    _log_stamp = ""
+    
+    def __init__(self, role, camera_type="rgb", display=True, record_path=None, action_format="json"):
         self.role = role  # 'robot' or 'operator'
         self.camera_type = camera_type  # Camera type to stream
+        # Show received video in OpenCV windows (operator mode); headless
+        # systems skip display, and the per-frame BGR conversion, entirely
+        self.display = display and self._display_available()
+        self.record_path = record_path  # Record received video to this file (operator mode)
+        self.action_format = action_format  # Control action encoding sent by the operator: 'json' or 'msgpack'
         self.pc = None
         self.ws = None
         self.data_channel = None
+        self._loop = None  # Event loop the client runs on, set when the peer connection is created
         self.camera_tracks = []  # Support multiple camera tracks
         self.video_windows = {}  # Track window names for operator mode
+        self._candidate_queue = []  # Local ICE candidates awaiting a batched send
+        self._candidate_flush_pending = False
+        self._send_queue = collections.deque(maxlen=1)  # Encoded action awaiting send; appending replaces a stale one
+        self._signal_queue = asyncio.Queue()  # Received signaling messages awaiting dispatch
+        self._signal_tasks = set()  # In-flight signaling handlers
+        self._sdp_lock = asyncio.Lock()  # Serializes offer/answer handling
+        self._remote_description_set = asyncio.Event()
+        self._latest_action = None  # Newest action, sent on the next tick
+        self._action_dirty = False
+        self._action_task = None
+        
+        # Operator display runs on its own UI thread fed by a single-frame buffer
+        self._display_frames = collections.deque(maxlen=1)  # Appending drops the stale frame
+        self._display_ready = threading.Event()
+        self._display_stop = False
+        self._display_thread = None
+        self._display_failed = False
+        self._closed_windows = set()  # Windows closed by the user or by track end
+        self._open_windows = set()  # Windows currently shown
+        self._last_window = None  # Window that receives the 'q' key
         
+        self._recorder_threads = []  # Encoder threads, joined on cleanup
+        
+    @staticmethod
+    def _display_available():
+        """Check whether this system has a display for OpenCV windows
+        
+        Returns:
+            False on Linux without an X11/Wayland display, True otherwise
+        """
+        if sys.platform.startswith("linux"):
+            return bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+        return True
+    
     def _log(self, message):
         """Internal logging method"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        print(f"{timestamp} - {message}")
+        # Format the timestamp at most once per wall-clock second
+        now = int(time.time())
+        if now != self._log_second:
+            self._log_second = now
+            self._log_stamp = time.strftime("%H:%M:%S", time.localtime(now))
+        print(f"{self._log_stamp} - {message}")
         logger.info(message)
     
     def _setup_peer_connection(self):
         """Initialize RTCPeerConnection with ICE servers and event handlers"""
-        ice_servers = [RTCIceServer(urls=server["urls"]) for server in ICE_SERVERS]
-        config = RTCConfiguration(iceServers=ice_servers)
-        self.pc = RTCPeerConnection(configuration=config)
+        # Cache the running loop once for callbacks that schedule work
+        self._loop = asyncio.get_running_loop()
+        self.pc = RTCPeerConnection(configuration=_ICE_CONFIG)
         
         @self.pc.on("icecandidate")
-        async def on_icecandidate(candidate):
+        def on_icecandidate(candidate):
             if candidate:
-                await self._send_signal({
-                    "type": "candidate",
-                    "candidate": {
-                        "candidate": candidate.candidate,
-                        "sdpMid": candidate.sdpMid,
-                        "sdpMLineIndex": candidate.sdpMLineIndex
-                    }
+                self._queue_candidate({
+                    "candidate": candidate.candidate,
+                    "sdpMid": candidate.sdpMid,
+                    "sdpMLineIndex": candidate.sdpMLineIndex
                 })
         
         @self.pc.on("connectionstatechange")
@@ -99,14 +197,19 @@ class WebRTCClient:
             @channel.on("message")
             def on_message(message):
                 try:
-                    action = json.loads(message)
+                    if isinstance(message, bytes):
+                        # Binary messages carry msgpack-encoded actions
+                        action = msgpack.unpackb(message, raw=False)
+                    else:
+                        action = orjson.loads(message)
                     self._handle_robot_action(action)
-                except json.JSONDecodeError:
-                    self._log(f"Received non-JSON message: {message}")
+                except (ValueError, msgpack.UnpackException):
+                    self._log(f"Received undecodable message: {message!r}")
     
     def _handle_robot_action(self, action):
         """Process received robot control actions"""
-        self._log(f"Action received: {json.dumps(action)}")
+        # repr(), not JSON: msgpack actions may carry bytes values or keys
+        self._log(f"Action received: {action!r}")
         # Implement robot control logic here
     
     def _setup_operator_handlers(self):
@@ -118,7 +221,7 @@ class WebRTCClient:
             self._log(f"Video stream received: {track.kind}")
             if track.kind == "video":
                 self.track_counter += 1
-                asyncio.create_task(self._receive_video_frames(track, self.track_counter))
+                self._loop.create_task(self._receive_video_frames(track, self.track_counter))
     
     async def _receive_video_frames(self, track, track_id):
         """Receive and display video frames in operator mode
@@ -131,94 +234,407 @@ class WebRTCClient:
         self.video_windows[track_id] = window_name
         
         frame_count = 0
-        display_enabled = True
-        display_error_shown = False
+        display_enabled = self.display
+        next_display_time = 0.0
+        stream_offset = None  # Local clock minus media time of the last live frame
+        dropped_frames = 0
+        record_frames = None  # Frames handed to the recorder thread
+        recorder = None
+        record_dropped = 0
+        
+        # Bind per-frame lookups to locals once, outside the hot loop
+        recv = track.recv
+        monotonic = time.monotonic
+        log = self._log
+        show_frame = self._show_frame
+        frame_to_bgr = self._frame_to_bgr
+        record = bool(self.record_path)
         
         try:
             while True:
-                frame = await track.recv()
+                recv_start = monotonic()
+                frame = await recv()
+                now = monotonic()
                 frame_count += 1
-                img = frame.to_ndarray(format="bgr24")
                 
-                if display_enabled:
-                    try:
-                        cv2.imshow(window_name, img)
-                        if cv2.waitKey(1) & 0xFF == ord('q'):
-                            self._log(f"{window_name} display closed by user")
-                            break
-                    except cv2.error:
-                        if not display_error_shown:
-                            self._log(f"Video display not available on this system for {window_name}")
-                            display_error_shown = True
+                # Latency monitor: if we fell behind live (e.g. a GUI stall),
+                # skip displaying queued frames until caught up
+                late = False
+                if display_enabled and frame.pts is not None:
+                    frame_time = float(frame.pts * frame.time_base)
+                    # A frame we had to wait for is live; re-anchor on it so
+                    # sender clock drift or pts jumps never accumulate as lag
+                    if stream_offset is None or now - recv_start > LIVE_RECV_WAIT:
+                        stream_offset = now - frame_time
+                    late = now - stream_offset - frame_time > MAX_DISPLAY_LAG
+                    if late:
+                        dropped_frames += 1
+                    elif dropped_frames:
+                        log(f"{window_name}: Dropped {dropped_frames} late frames to catch up")
+                        dropped_frames = 0
+                
+                # Only convert to BGR for frames that will actually be shown;
+                # display is decimated independently of the receive rate
+                if display_enabled and not late and now >= next_display_time:
+                    next_display_time = now + DISPLAY_INTERVAL - DISPLAY_SLACK
+                    if self._display_failed:
+                        log(f"Video display not available on this system for {window_name}")
                         display_enabled = False
+                    elif window_name in self._closed_windows:
+                        log(f"{window_name} display closed by user")
+                        break
+                    else:
+                        show_frame(window_name, frame_to_bgr(frame))
+                
+                # Record the decoded YUV frame as-is, without an RGB round
+                # trip; encoding happens on the recorder thread
+                if record:
+                    if recorder is None:
+                        record_frames = queue.SimpleQueue()
+                        recorder = threading.Thread(
+                            target=self._record_loop,
+                            args=(track_id, record_frames),
+                            name=f"video-record-{track_id}",
+                            daemon=True
+                        )
+                        recorder.start()
+                        self._recorder_threads.append(recorder)
+                    if not recorder.is_alive():
+                        record = False  # The recorder failed and logged why
+                    elif record_frames.qsize() < RECORD_QUEUE_SIZE:
+                        record_frames.put(frame)
+                    else:
+                        record_dropped += 1
                 
                 if frame_count % 30 == 0:
-                    self._log(f"{window_name}: Received {frame_count} frames")
+                    log(f"{window_name}: Received {frame_count} frames")
         
         except Exception as e:
             self._log(f"Error receiving video on {window_name}: {str(e)}")
         finally:
             if display_enabled:
+                # Close this window, on the UI thread if one is running
+                self._closed_windows.add(window_name)
+                if self._display_thread is not None:
+                    self._display_ready.set()
+                elif DISPLAY_ON_LOOP_THREAD and self._open_windows:
+                    self._update_display()
+            
+            if recorder is not None:
+                record_frames.put(None)  # Flush and close the file
+                if record_dropped:
+                    self._log(f"{window_name}: Recorder dropped {record_dropped} frames")
+    
+    @staticmethod
+    def _frame_to_bgr(frame):
+        """Return a BGR ndarray view over a video frame's pixel plane
+        
+        Unlike VideoFrame.to_ndarray(), row padding (line_size > width * 3) is
+        kept as a stride instead of being copied out; cv2.imshow accepts it.
+        The view keeps the underlying frame alive.
+        
+        Args:
+            frame: Received VideoFrame (any pixel format)
+        
+        Returns:
+            (height, width, 3) uint8 ndarray
+        """
+        if frame.format.name != "bgr24":
+            frame = frame.reformat(format="bgr24")
+        plane = frame.planes[0]
+        return np.ndarray(
+            (frame.height, frame.width, 3),
+            dtype=np.uint8,
+            buffer=plane,
+            strides=(plane.line_size, 3, 1)
+        )
+    
+    def _show_frame(self, window_name, img):
+        """Hand a frame to the UI thread, dropping any frame not yet shown
+        
+        Args:
+            window_name: Window to show the frame in
+            img: BGR ndarray
+        """
+        if DISPLAY_ON_LOOP_THREAD:
+            self._display_frames.append((window_name, img))
+            self._update_display()
+            return
+        
+        if self._display_thread is None:
+            self._display_thread = threading.Thread(
+                target=self._display_loop,
+                name="video-display",
+                daemon=True
+            )
+            self._display_thread.start()
+        
+        self._display_frames.append((window_name, img))
+        self._display_ready.set()
+    
+    def _display_loop(self):
+        """Show the latest handed-off frame on the UI thread
+        
+        All HighGUI calls (imshow, waitKey, destroyWindow) happen here so a
+        slow window system never blocks the asyncio loop. Frames that arrive
+        faster than they can be shown are dropped, never queued.
+        """
+        while not self._display_stop:
+            # Wake on a new frame, or periodically to keep windows responsive
+            self._display_ready.wait(DISPLAY_INTERVAL)
+            self._display_ready.clear()
+            if not self._update_display():
+                break
+        
+        try:
+            cv2.destroyAllWindows()
+        except cv2.error:
+            pass
+    
+    def _update_display(self):
+        """Show the pending frame, poll the keyboard and close finished windows
+        
+        Pressing 'q' marks the last shown window as closed;
+        _receive_video_frames then stops.
+        
+        Returns:
+            False if HighGUI failed (sets _display_failed), True otherwise
+        """
+        try:
+            window_name, img = self._display_frames.popleft()
+        except IndexError:
+            window_name, img = None, None
+        
+        try:
+            if window_name is not None and window_name not in self._closed_windows:
+                cv2.imshow(window_name, img)
+                self._open_windows.add(window_name)
+                self._last_window = window_name
+            
+            if self._open_windows and cv2.waitKey(1) & 0xFF == ord('q'):
+                self._closed_windows.add(self._last_window)
+            
+            for name in self._open_windows & self._closed_windows:
+                cv2.destroyWindow(name)
+            self._open_windows -= self._closed_windows
+        except cv2.error:
+            self._display_failed = True
+            return False
+        return True
+    
+    def _record_loop(self, track_id, frames):
+        """Encode received frames to the recording file on the recorder thread
+        
+        Timestamps are rebased to the first frame, and any non-increasing pts
+        (sender jitter, RTP timestamp wrap) is bumped just past the previous
+        one. Errors stop recording only; video reception continues.
+        
+        Args:
+            track_id: Unique identifier for the track being recorded
+            frames: Queue of VideoFrames, terminated by None
+        """
+        container = None
+        try:
+            while True:
+                frame = frames.get()
+                if frame is None:
+                    break
+                if frame.pts is None:
+                    continue
+                
+                if container is None:
+                    container, stream = self._open_recorder(track_id, frame)
+                    pts_origin = frame.pts
+                    last_pts = None
+                
+                pts = frame.pts - pts_origin
+                if last_pts is not None and pts <= last_pts:
+                    pts_origin -= last_pts + 1 - pts
+                    pts = last_pts + 1
+                last_pts = pts
+                frame.pts = pts
+                
+                for packet in stream.encode(frame):
+                    container.mux(packet)
+            
+            if container is not None:
+                for packet in stream.encode():
+                    container.mux(packet)
+        except Exception as e:
+            self._log(f"Recording Camera {track_id} stopped: {e}")
+        finally:
+            if container is not None:
                 try:
-                    cv2.destroyWindow(window_name)
-                except:
-                    pass
+                    container.close()
+                except Exception as e:
+                    self._log(f"Error closing recording for Camera {track_id}: {e}")
+    
+    def _open_recorder(self, track_id, frame):
+        """Open an H.264 output container for a received video track
+        
+        Args:
+            track_id: Unique identifier for the track (suffixed to the file name
+                when more than one track is recorded)
+            frame: First received frame, used to size the encoder and as
+                the time base of the recording
+        
+        Returns:
+            Tuple of (container, stream)
+        """
+        path = self.record_path
+        if track_id > 1:
+            base, ext = os.path.splitext(path)
+            path = f"{base}_{track_id}{ext}"
+        
+        container = av.open(path, mode="w")
+        stream = container.add_stream("libx264")
+        stream.width = frame.width
+        stream.height = frame.height
+        stream.pix_fmt = "yuv420p"
+        # Keep the sender's clock so jittered timestamps are not collapsed
+        # onto a fixed frame rate
+        stream.codec_context.time_base = frame.time_base
+        stream.time_base = frame.time_base
+        
+        self._log(f"Recording Camera {track_id} to {path}")
+        return container, stream
     
     def _setup_data_channel(self):
         """Setup data channel for operator mode"""
         self.data_channel = self.pc.createDataChannel("robot-control")
+        self.data_channel.bufferedAmountLowThreshold = SEND_LOW_THRESHOLD
         
         @self.data_channel.on("open")
         def on_open():
             self._log("Data channel opened (Operator)")
+            self._drain_send_queue()
+        
+        @self.data_channel.on("bufferedamountlow")
+        def on_bufferedamountlow():
+            self._drain_send_queue()
         
         @self.data_channel.on("close")
         def on_close():
             self._log("Data channel closed")
     
     def send_action(self, action):
-        """Send control action to robot"""
+        """Send control action to robot
+        
+        Only the latest action is kept; _action_tick() sends it every
+        ACTION_INTERVAL, so redundant state updates in between are merged.
+        """
 
         if self.data_channel and self.data_channel.readyState == "open":
-            # TODO: Implement action sending logic
+            self._latest_action = action
+            self._action_dirty = True
+        else:
+            self._log("Data channel not ready")
+    
+    async def _action_tick(self):
+        """Send the latest control action every ACTION_INTERVAL
+        
+        Nothing is sent on ticks without a new action. While the channel is
+        above SEND_HIGH_WATERMARK the encoded action waits in a single pending
+        slot, and each newer tick replaces it, so stale commands are never
+        replayed to the robot once the channel drains.
+        """
+        while True:
+            await asyncio.sleep(ACTION_INTERVAL)
+            if self._action_dirty and self.data_channel.readyState == "open":
+                self._action_dirty = False
+                try:
+                    self._send_queue.append(self._encode_action(self._latest_action))
+                except Exception as e:
+                    # Log and keep ticking; the bad action is not retried
+                    self._log(f"Error sending action: {str(e)}")
+                    continue
+                self._drain_send_queue()
+    
+    def _encode_action(self, action):
+        """Encode a control action for the data channel
+        
+        Returns:
+            msgpack bytes (sent as a binary message) when action_format is
+            'msgpack', otherwise JSON text, which browser peers JSON.parse()
+        """
+        if self.action_format == "msgpack":
+            return msgpack.packb(action, use_bin_type=True)
+        try:
+            return orjson.dumps(action, option=ACTION_JSON_OPTIONS).decode()
+        except TypeError:
+            # Types orjson still rejects (e.g. other float subclasses)
+            return json.dumps(action)
+    
+    def _drain_send_queue(self):
+        """Send the pending action unless the data channel buffer is above the high watermark"""
+        while self._send_queue and self.data_channel.bufferedAmount < SEND_HIGH_WATERMARK:
             try:
-                self.data_channel.send(json.dumps(action))
+                self.data_channel.send(self._send_queue.popleft())
             except Exception as e:
                 self._log(f"Error sending action: {str(e)}")
-        else:
-            self._log("Data channel not ready")
+                break
     
     async def _connect_to_signaling(self):
         """Connect to WebSocket signaling server"""
         self._log("Connecting to signaling server...")
         
         try:
-            async with websockets.connect(SIGNALING_SERVER_URL) as websocket:
+            # Signaling payloads are small JSON; permessage-deflate only costs CPU
+            async with websockets.connect(
+                SIGNALING_SERVER_URL,
+                compression=None,
+                max_size=2**20,
+                ping_interval=20
+            ) as websocket:
                 self.ws = websocket
                 self._log("Connected to signaling server")
                 
                 if self.role == 'operator':
                     await self._create_and_send_offer()
                 
-                async for message in websocket:
-                    await self._handle_signaling_message(message)
+                # Keep pulling from the socket while slow handlers (e.g.
+                # setRemoteDescription) run; the worker dispatches messages
+                worker = self._loop.create_task(self._signal_worker())
+                try:
+                    async for message in websocket:
+                        self._signal_queue.put_nowait(message)
+                finally:
+                    worker.cancel()
         
         except Exception as e:
             self._log(f"WebSocket error: {str(e)}")
             raise
     
+    async def _signal_worker(self):
+        """Dispatch queued signaling messages to concurrent handler tasks
+        
+        Offers/answers are serialized by _sdp_lock inside their handlers;
+        ICE candidates commute, so they are handled in parallel.
+        """
+        while True:
+            message = await self._signal_queue.get()
+            task = self._loop.create_task(self._handle_signaling_message(message))
+            self._signal_tasks.add(task)
+            task.add_done_callback(self._signal_tasks.discard)
+    
     async def _handle_signaling_message(self, message):
         """Handle incoming signaling messages"""
         try:
-            data = json.loads(message)
+            data = orjson.loads(message)
             msg_type = data.get("type")
             
             if msg_type == "offer" and self.role == 'robot':
-                await self._handle_offer(data["offer"])
+                async with self._sdp_lock:
+                    await self._handle_offer(data["offer"])
             elif msg_type == "answer" and self.role == 'operator':
-                await self._handle_answer(data["answer"])
+                async with self._sdp_lock:
+                    await self._handle_answer(data["answer"])
             elif msg_type == "candidate":
                 await self._handle_candidate(data["candidate"])
+            elif msg_type == "candidates":
+                await asyncio.gather(*(
+                    self._handle_candidate(candidate) for candidate in data["candidates"]
+                ))
         
         except Exception as e:
             self._log(f"Error handling signaling message: {str(e)}")
@@ -229,6 +645,7 @@ class WebRTCClient:
         await self.pc.setRemoteDescription(
             RTCSessionDescription(sdp=offer["sdp"], type=offer["type"])
         )
+        self._remote_description_set.set()
         answer = await self.pc.createAnswer()
         await self.pc.setLocalDescription(answer)
         await self._send_signal({
@@ -246,9 +663,12 @@ class WebRTCClient:
         await self.pc.setRemoteDescription(
             RTCSessionDescription(sdp=answer["sdp"], type=answer["type"])
         )
+        self._remote_description_set.set()
     
     async def _handle_candidate(self, candidate):
         """Handle ICE candidate"""
+        # Candidates can only be applied once the remote description is set
+        await self._remote_description_set.wait()
         await self.pc.addIceCandidate(
             RTCIceCandidate(
                 candidate=candidate["candidate"],
@@ -270,11 +690,33 @@ class WebRTCClient:
         })
         self._log("Sent offer")
     
+    def _queue_candidate(self, candidate):
+        """Queue a local ICE candidate for the next batched signaling message
+        
+        Candidates arrive in bursts; the flush runs once the current burst of
+        callbacks has been processed so they share a single WebSocket message.
+        """
+        self._candidate_queue.append(candidate)
+        if not self._candidate_flush_pending:
+            self._candidate_flush_pending = True
+            self._loop.call_soon(self._flush_candidates)
+    
+    def _flush_candidates(self):
+        """Send queued ICE candidates, at most MAX_CANDIDATES_PER_MESSAGE per message"""
+        self._candidate_flush_pending = False
+        candidates, self._candidate_queue = self._candidate_queue, []
+        
+        for i in range(0, len(candidates), MAX_CANDIDATES_PER_MESSAGE):
+            self._loop.create_task(self._send_signal({
+                "type": "candidates",
+                "candidates": candidates[i:i + MAX_CANDIDATES_PER_MESSAGE]
+            }))
+    
     async def _send_signal(self, data):
         """Send signaling data via WebSocket"""
         if self.ws:
             try:
-                await self.ws.send(json.dumps(data))
+                await self.ws.send(orjson.dumps(data))
             except Exception as e:
                 self._log(f"Error sending signal: {str(e)}")
     
@@ -334,6 +776,8 @@ class WebRTCClient:
     async def start_as_operator(self):
         """Start client in operator mode"""
         self._log("Starting as OPERATOR (Controller)")
+        if not self.display:
+            self._log("Video display disabled (headless or --no-display)")
         
         self._setup_peer_connection()
         
@@ -342,26 +786,43 @@ class WebRTCClient:
         self._log("Set up to receive 1 video track")
         
         self._setup_data_channel()
+        self._action_task = self._loop.create_task(self._action_tick())
         
         await self._connect_to_signaling()
     
     async def cleanup(self):
         """Cleanup resources"""
+        if self._action_task is not None:
+            self._action_task.cancel()
+        
         if self.pc:
             await self.pc.close()
         
-        # Stop all camera tracks
+        # Stop all camera tracks off the event loop (joins the capture thread
+        # and waits for the driver to release the device)
+        loop = asyncio.get_running_loop()
         for track in self.camera_tracks:
             try:
-                track.stop()
+                await loop.run_in_executor(None, track.stop)
             except Exception as e:
                 self._log(f"Error stopping camera track: {e}")
         
-        # Close all video windows
-        try:
-            cv2.destroyAllWindows()
-        except:
-            pass
+        # Stop the UI thread; it closes all video windows on exit
+        if self._display_thread is not None:
+            self._display_stop = True
+            self._display_ready.set()
+            await loop.run_in_executor(None, self._display_thread.join, 1.0)
+            self._display_thread = None
+        elif DISPLAY_ON_LOOP_THREAD and self._open_windows:
+            try:
+                cv2.destroyAllWindows()
+            except cv2.error:
+                pass
+        
+        # Let recorders finish encoding queued frames and close their files
+        for recorder in self._recorder_threads:
+            await loop.run_in_executor(None, recorder.join, 5.0)
+        self._recorder_threads.clear()
 
 
 async def main():
@@ -381,6 +842,24 @@ async def main():
         default='rgb',
         help='Camera type to stream (only for robot mode): rgb, realsense_rgb, or realsense_depth'
     )
+    parser.add_argument(
+        '--no-display',
+        action='store_true',
+        help='Do not open video windows (only for operator mode)'
+    )
+    parser.add_argument(
+        '--record',
+        type=str,
+        metavar='PATH',
+        help='Record received video to this file, e.g. session.mp4 (only for operator mode)'
+    )
+    parser.add_argument(
+        '--action-format',
+        type=str,
+        choices=['json', 'msgpack'],
+        default='json',
+        help='Control action encoding (only for operator mode); msgpack requires a Python robot'
+    )
     
     args = parser.parse_args()
     
@@ -427,7 +906,18 @@ async def main():
         role = args.role
         camera_type = args.camera
     
-    client = WebRTCClient(role, camera_type=camera_type)
+    # Tasks that complete without suspending (signaling handlers, callbacks)
+    # run immediately instead of round-tripping through the scheduler
+    if sys.version_info >= (3, 12):
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+    
+    client = WebRTCClient(
+        role,
+        camera_type=camera_type,
+        display=not args.no_display,
+        record_path=args.record,
+        action_format=args.action_format
+    )
     
     try:
         if role == 'robot':
@@ -436,7 +926,8 @@ async def main():
             await client.start_as_operator()
         
         print("\nClient running. Press Ctrl+C to stop.\n")
-        await asyncio.Event().wait()
+        # Park forever on a never-resolved future; Ctrl+C unwinds to cleanup()
+        await asyncio.get_running_loop().create_future()
     
     except KeyboardInterrupt:
         print("\nShutting down...")
@@ -448,4 +939,7 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
@@ -1,33 +1,63 @@
+import glob
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
 import cv2 as cv
 
+# CAP_DSHOW is often better for Windows USB cameras and fails fast on absent indices
+CAPTURE_BACKEND = cv.CAP_DSHOW if sys.platform == "win32" else cv.CAP_ANY
+
+def candidate_ports():
+    """
+    Return the camera indices worth probing: the existing /dev/video* nodes on Linux,
+    otherwise indices 0-19.
+    """
+    if sys.platform.startswith("linux"):
+        nodes = (node[len("/dev/video"):] for node in glob.glob("/dev/video*"))
+        return sorted(int(index) for index in nodes if index.isdigit())
+    return list(range(20))
+
+def probe_port(dev_port):
+    """
+    Open a single camera index and return (port, is_present, is_reading, width, height).
+    """
+    camera = cv.VideoCapture(dev_port, CAPTURE_BACKEND)
+    if not camera.isOpened():
+        return dev_port, False, False, 0, 0
+
+    is_reading, img = camera.read()
+    w = camera.get(3)
+    h = camera.get(4)
+    camera.release()
+    return dev_port, True, is_reading, w, h
+
 def list_ports():
     """
     Test the ports and returns a tuple with the available ports and the ones that are working.
     """
-    is_working = True
-    dev_port = 0
     working_ports = []
     available_ports = []
-    
-    print("Scanning camera indices 0-20...")
-    
-    while dev_port < 20:
-        # Try with CAP_DSHOW which is often better for Windows USB cameras
-        camera = cv.VideoCapture(dev_port)
-            
-        if camera.isOpened():
-            is_reading, img = camera.read()
-            w = camera.get(3)
-            h = camera.get(4)
-            if is_reading:
-                print(f"Port {dev_port} is working and reads images ({w}x{h})")
-                working_ports.append(dev_port)
-            else:
-                print(f"Port {dev_port} is present but cannot read images ({w}x{h})")
-                available_ports.append(dev_port)
-            camera.release()
-        dev_port += 1
-        
+
+    backends = [cv.videoio_registry.getBackendName(b) for b in cv.videoio_registry.getCameraBackends()]
+    print(f"Camera backends: {', '.join(backends)}")
+
+    ports = candidate_ports()
+    print(f"Scanning camera indices {ports}...")
+
+    # Probe indices in parallel so absent devices' driver timeouts overlap
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(probe_port, ports))
+
+    for dev_port, is_present, is_reading, w, h in results:
+        if not is_present:
+            continue
+        if is_reading:
+            print(f"Port {dev_port} is working and reads images ({w}x{h})")
+            working_ports.append(dev_port)
+        else:
+            print(f"Port {dev_port} is present but cannot read images ({w}x{h})")
+            available_ports.append(dev_port)
+
     return available_ports, working_ports
 
 if __name__ == "__main__":
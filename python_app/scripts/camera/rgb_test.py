@@ -1,11 +1,24 @@
+import time
+
 import cv2 as cv
 
 video = cv.VideoCapture(1)
+
+# Pace the loop at the camera frame rate instead of spinning on waitKey
+fps = video.get(cv.CAP_PROP_FPS) or 30
+period = 1.0 / fps
+
 while True:
+    t0 = time.perf_counter()
     ret, frame = video.read()
+    if not ret:
+        print("Failed to read frame from camera")
+        break
+
     cv.imshow("Frame", frame)
-    if cv.waitKey(1) & 0xFF == ord("q"):
+    remaining_ms = int((period - (time.perf_counter() - t0)) * 1000)
+    if cv.waitKey(max(1, remaining_ms)) & 0xFF == ord("q"):
         break
 
 video.release()
-cv.destroyAllWindows()
\ No newline at end of file
+cv.destroyAllWindows()